@@ -1,15 +1,47 @@
-import whisper
 import argparse
+import functools
+import mmap
 import os
 import torch
 import re
-from rapidfuzz import fuzz
+import numpy as np
+from faster_whisper import WhisperModel
+
+try:
+    import ahocorasick
+except ImportError:  # exact hits fall back to plain substring checks
+    ahocorasick = None
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # fuzzy scores come from the Numba kernel below instead
+    fuzz = process = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # the kernel still works, just as plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda fn: fn
 
 # ---- STEP 1: Whisper Transcription ----
-def get_transcript(file_path, model_name):
-    print(f"Loading Whisper model: '{model_name}'...")
+@functools.lru_cache(maxsize=4)
+def _get_whisper_model(model_name, device):
+    # Loading the weights takes seconds, so keep each (model, device) pair around
+    # and reuse it for every transcription in this process.
+    # CTranslate2 backend: INT8 weights on CPU, FP16 on GPU.
+    compute_type = "float16" if device == "cuda" else "int8"
+    print(f"Loading Whisper model: '{model_name}' on {device} ({compute_type})...")
+    return WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=os.cpu_count() or 0)
+
+
+def _transcribe_segments(file_path, model_name):
+    # Returns faster-whisper's lazy segment generator (decoding happens while it
+    # is consumed), or None if the model or file could not be loaded.
+    device = "cuda" if torch.cuda.is_available() else "cpu"
     try:
-        model = whisper.load_model(model_name)
+        model = _get_whisper_model(model_name, device)
     except Exception as e:
         print(f"Error loading model '{model_name}': {e}")
         return None
@@ -18,94 +50,225 @@ def get_transcript(file_path, model_name):
         print(f"Error: File not found at {file_path}")
         return None
 
-    use_fp16 = torch.cuda.is_available()
-    print("GPU detected. Using FP16." if use_fp16 else "No GPU found. Using CPU (slower).")
+    print("GPU detected. Using FP16." if device == "cuda" else "No GPU found. Using CPU (INT8).")
 
     print(f"Transcribing: {file_path}...")
     try:
-        result = model.transcribe(file_path, fp16=use_fp16)
+        # Short symptom clips: greedy decoding, no temperature fallback and no
+        # conditioning on earlier text; VAD drops silence before the encoder runs.
+        segments, _ = model.transcribe(
+            file_path,
+            beam_size=1,
+            best_of=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            no_speech_threshold=0.6,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500),
+        )
+        return segments
+    except Exception as e:
+        print(f"Error during transcription: {e}")
+        return None
+
+
+def get_transcript(file_path, model_name):
+    segments = _transcribe_segments(file_path, model_name)
+    if segments is None:
+        return None
+
+    try:
+        text = "".join(seg.text for seg in segments)
         print("Transcription complete.")
-        return result["text"]
+        return text
     except Exception as e:
         print(f"Error during transcription: {e}")
         return None
 
 
 # ---- STEP 2: Get Unique Words from Transcript ----
-def get_transcript_words(text):
-    text = text.lower()
-    # Remove punctuation using regex
-    text = re.sub(r"[^\w\s]", "", text)
+# Punctuation stripping: str.translate for ASCII text, precompiled regex otherwise.
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_DROP_TABLE = str.maketrans("", "", "".join(chr(c) for c in range(128) if _PUNCT_RE.match(chr(c))))
+
+# Define common stop words to ignore (EXPANDED LIST)
+STOP_WORDS = frozenset({
+    # Basic English
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", 
+    "in", "is", "it", "its", "it's", "of", "on", "or", "so", "such", 
+    "that", "the", "their", "then", "there", "these", "they", "this", 
+    "to", "was", "with",
     
-    # Define common stop words to ignore (EXPANDED LIST)
-    stop_words = {
-        # Basic English
-        "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", 
-        "in", "is", "it", "its", "it's", "of", "on", "or", "so", "such", 
-        "that", "the", "their", "then", "there", "these", "they", "this", 
-        "to", "was", "with",
-        
-        # Pronouns / People
-        "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", 
-        "your", "yours", "yourself", "yourselves", "he", "him", "his", 
-        "himself", "she", "her", "hers", "herself", "they", "them", "their", 
-        "theirs", "themselves",
-        
-        # Verbs / Modals
-        "am", "been", "being", "can", "could", "did", "do", "does", "doesn't", 
-        "doing", "don't", "get", "gets", "getting", "got", "gotten", "go", 
-        "goes", "going", "had", "has", "hasn't", "have", "haven't", "having", 
-        "is", "isn't", "make", "makes", "making", "should", "used", "was", 
-        "wasn't", "were", "weren't", "will", "would",
-        
-        # Conversational Filler / Context
-        "about", "after", "against", "all", "almost", "also", "although", 
-        "always", "any", "anywhere", "because", "become", "before", "bit", 
-        "chapped", "clothes", "come", "concern", "cuts", "else", "especially", 
-        "even", "every", "feel", "feels", "feeling", "find", "found", "from", 
-        "further", "here", "how", "however", "just", "kind", "know", "like", 
-        "little", "look", "looks", "made", "many", "may", "more", "most", 
-        "much", "must", "now", "noticed", "onto", "other", "over", "own", 
-        "pexing", "quite", "read", "really", "see", "seen", "seem", "seemed", 
-        "see", "show", "since", "skin", "small", "some", "sometimes", "soon", 
-        "spot", "spread", "started", "still", "such", "than", "thank", "thanks", 
-        "that's", "there", "therefore", "these", "those", "through", "time", 
-        "times", "today", "too", "try", "up", "upon", "us", "very", "want", 
-        "wanted", "way", "well", "what", "when", "where", "which", "while", 
-        "who", "whom", "why", "work"
-    }
-                  
+    # Pronouns / People
+    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", 
+    "your", "yours", "yourself", "yourselves", "he", "him", "his", 
+    "himself", "she", "her", "hers", "herself", "they", "them", "their", 
+    "theirs", "themselves",
+    
+    # Verbs / Modals
+    "am", "been", "being", "can", "could", "did", "do", "does", "doesn't", 
+    "doing", "don't", "get", "gets", "getting", "got", "gotten", "go", 
+    "goes", "going", "had", "has", "hasn't", "have", "haven't", "having", 
+    "is", "isn't", "make", "makes", "making", "should", "used", "was", 
+    "wasn't", "were", "weren't", "will", "would",
+    
+    # Conversational Filler / Context
+    "about", "after", "against", "all", "almost", "also", "although", 
+    "always", "any", "anywhere", "because", "become", "before", "bit", 
+    "chapped", "clothes", "come", "concern", "cuts", "else", "especially", 
+    "even", "every", "feel", "feels", "feeling", "find", "found", "from", 
+    "further", "here", "how", "however", "just", "kind", "know", "like", 
+    "little", "look", "looks", "made", "many", "may", "more", "most", 
+    "much", "must", "now", "noticed", "onto", "other", "over", "own", 
+    "pexing", "quite", "read", "really", "see", "seen", "seem", "seemed", 
+    "see", "show", "since", "skin", "small", "some", "sometimes", "soon", 
+    "spot", "spread", "started", "still", "such", "than", "thank", "thanks", 
+    "that's", "there", "therefore", "these", "those", "through", "time", 
+    "times", "today", "too", "try", "up", "upon", "us", "very", "want", 
+    "wanted", "way", "well", "what", "when", "where", "which", "while", 
+    "who", "whom", "why", "work"
+})
+
+def _split_words(text):
+    # Lowercases, removes punctuation and splits on whitespace.
+    text = text.lower()
+    text = text.translate(_DROP_TABLE) if text.isascii() else _PUNCT_RE.sub("", text)
+    return text.split()
+
+
+def get_transcript_words(text):
     # Split text into words, filter out stop words and short words
-    all_words = text.split()
-    found_keywords = {word for word in all_words if word not in stop_words and len(word) > 2}
+    all_words = _split_words(text)
+    found_keywords = {word for word in all_words if len(word) > 2 and word not in STOP_WORDS}
 
-    return sorted(found_keywords)
+    return found_keywords
 
 
-# ---- STEP 3: Match Extracted Keywords with Diseases (NEW LOGIC) ----
-def match_disease(extracted_keywords, transcript_text, keyword_folder="keywords"):
-    # This stop_tokens list is a bit redundant now but harmless
-    stop_tokens = {"a", "an", "the", "is", "it", "i", "me", "my", "we", "you", "he", "she", "they", "small", "large"}
-    extracted = [k for k in extracted_keywords if len(k) >= 3 and k not in stop_tokens]
-    if not extracted:
-        return ("NoKeywords", 0), []
+# ---- Fuzzy Scoring Fallback (used only when RapidFuzz is not installed) ----
+# Reproduces fuzz.partial_ratio: the shorter string is slid along the longer
+# one and each window is scored with the Indel ratio. The LCS length comes from
+# a bit-parallel (Hyyro) kernel for needles under 63 characters, where s + u
+# still fits in a signed 64-bit word (masks are int64 arrays, so the non-jitted
+# path must not wrap either), and from a plain DP row otherwise.
+@njit(cache=True)
+def _window_ratio(a, a_len, masks, b, start, end):
+    lcs = 0
+    if a_len < 63:
+        full = (1 << a_len) - 1
+        s = full
+        for k in range(start, end):
+            u = s & masks[b[k]]
+            s = ((s + u) | (s - u)) & full
+        rest = ~s & full
+        while rest:
+            rest &= rest - 1
+            lcs += 1
+    else:
+        row = np.zeros(a_len + 1, dtype=np.int64)
+        for k in range(start, end):
+            diag = 0
+            for j in range(a_len):
+                up = row[j + 1]
+                row[j + 1] = diag + 1 if a[j] == b[k] else max(row[j + 1], row[j])
+                diag = up
+        lcs = row[a_len]
+    lensum = a_len + end - start
+    return (1.0 - (lensum - 2 * lcs) / lensum) * 100.0
 
-    results = []
-    
-    # Check if keyword folder exists
+
+@njit(cache=True)
+def _partial_ratio_short_needle(a, a_len, b, b_len, masks):
+    for j in range(a_len):
+        masks[a[j]] |= 1 << (j % 63)
+
+    best = 0.0
+    # Windows hanging off the start, full-length windows, then windows off the end;
+    # a window is only scored if its new edge character occurs in the needle.
+    for i in range(1, a_len):
+        if masks[b[i - 1]] != 0:
+            best = max(best, _window_ratio(a, a_len, masks, b, 0, i))
+    for i in range(b_len - a_len):
+        if best < 100.0 and masks[b[i + a_len - 1]] != 0:
+            best = max(best, _window_ratio(a, a_len, masks, b, i, i + a_len))
+    for i in range(b_len - a_len, b_len):
+        if best < 100.0 and masks[b[i]] != 0:
+            best = max(best, _window_ratio(a, a_len, masks, b, i, b_len))
+
+    for j in range(a_len):
+        masks[a[j]] = 0
+    return best
+
+
+@njit(parallel=True, cache=True)
+def _partial_ratio_matrix(ext_chars, ext_lens, dk_chars, dk_lens, n_symbols):
+    scores = np.zeros((ext_lens.shape[0], dk_lens.shape[0]), dtype=np.float64)
+    for i in prange(ext_lens.shape[0]):
+        masks = np.zeros(n_symbols, dtype=np.int64)
+        e, e_len = ext_chars[i], ext_lens[i]
+        for j in range(dk_lens.shape[0]):
+            d, d_len = dk_chars[j], dk_lens[j]
+            if e_len <= d_len:
+                score = _partial_ratio_short_needle(e, e_len, d, d_len, masks)
+            else:
+                score = _partial_ratio_short_needle(d, d_len, e, e_len, masks)
+            if e_len == d_len and score < 100.0:
+                score = max(score, _partial_ratio_short_needle(d, d_len, e, e_len, masks))
+            scores[i, j] = score
+    return scores
+
+
+def _encode_strings(strings, symbols):
+    # Pads strings into an (n, max_len) array of small symbol ids plus their lengths.
+    chars = np.zeros((len(strings), max(map(len, strings))), dtype=np.int64)
+    lens = np.array([len(text) for text in strings], dtype=np.int64)
+    for row, text in enumerate(strings):
+        chars[row, :len(text)] = [symbols.setdefault(ch, len(symbols)) for ch in text]
+    return chars, lens
+
+
+def _fuzzy_score_matrix(extracted, all_keywords):
+    # partial_ratio for every (transcript word, disease keyword) pair, shape
+    # (len(extracted), len(all_keywords)).
+    if process is not None:
+        return process.cdist(extracted, all_keywords, scorer=fuzz.partial_ratio, dtype=np.float64, workers=-1)
+
+    symbols = {}
+    ext_chars, ext_lens = _encode_strings(extracted, symbols)
+    dk_chars, dk_lens = _encode_strings(all_keywords, symbols)
+    return _partial_ratio_matrix(ext_chars, ext_lens, dk_chars, dk_lens, len(symbols))
+
+
+# ---- Disease Keyword Corpus (read once, reused by every match) ----
+KEYWORD_FOLDER = "keywords"
+
+def _load_disease_keywords(keyword_folder):
+    # Returns {disease: [keyword, ...]} with keywords lowercased and shorter than
+    # 3 characters dropped, or None if the folder does not exist. The existence check
+    # is not cached, so a folder created later is picked up on the next call.
     if not os.path.isdir(keyword_folder):
-        print(f"Error: Keyword folder '{keyword_folder}' not found.")
-        print("Please make sure the 'keywords' folder is in the same directory as the script.")
-        return ("KeywordFolderNotFound", 0), []
+        return None
+    return _read_disease_keywords(keyword_folder)
 
+
+# The cached helpers below assume keyword_folder exists; callers check it with
+# _load_disease_keywords first.
+@functools.lru_cache(maxsize=None)
+def _read_disease_keywords(keyword_folder):
+    disease_keywords = {}
     for file_name in os.listdir(keyword_folder):
         if not file_name.endswith(".txt"):
             continue
         disease_name = file_name.replace(".txt", "")
-        
+
         try:
-            with open(os.path.join(keyword_folder, file_name), "r", encoding="utf-8") as f:
-                disease_keywords = [line.strip().lower() for line in f if line.strip()]
+            # Map the whole file and decode it once rather than line by line
+            with open(os.path.join(keyword_folder, file_name), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    text = ""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        text = mm[:].decode("utf-8")
+            keywords = [line.strip().lower() for line in text.splitlines() if line.strip()]
         except FileNotFoundError:
             print(f"Warning: Could not find file {file_name} while iterating, skipping.")
             continue
@@ -113,41 +276,179 @@ def match_disease(extracted_keywords, transcript_text, keyword_folder="keywords"
             print(f"Error reading {file_name}: {e}")
             continue
 
-        # --- fuzzy match average (NEW LOGIC) ---
-        # Answers: "How well does the transcript cover this disease's keywords?"
-        sum_best = 0.0
-        
-        # Filter disease keywords once
-        disease_keywords_long = [dk for dk in disease_keywords if len(dk) >= 3]
-        if not disease_keywords_long:
-            avg_fuzzy = 0.0 # No keywords to match
+        disease_keywords[disease_name] = [kw for kw in keywords if len(kw) >= 3]
+    return disease_keywords
+
+
+@functools.lru_cache(maxsize=None)
+def _partition_keywords(keyword_folder):
+    # Splits the unique keywords into single words, which can be matched against
+    # the transcript's word set, and phrases (or words with punctuation such as
+    # 'wart-like'), which still need a substring search.
+    tokens, phrases = set(), []
+    for keywords in _read_disease_keywords(keyword_folder).values():
+        for kw in keywords:
+            if _split_words(kw) == [kw]:
+                tokens.add(kw)
+            elif kw not in phrases:
+                phrases.append(kw)
+    return frozenset(tokens), phrases
+
+
+@functools.lru_cache(maxsize=None)
+def _build_keyword_automaton(keyword_folder):
+    # A single Aho-Corasick automaton over every keyword phrase, so the phrase pass
+    # is one linear sweep over the transcript instead of one search per phrase.
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in _partition_keywords(keyword_folder)[1]:
+        automaton.add_word(kw, kw)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=None)
+def _flatten_disease_keywords(keyword_folder):
+    # All disease keywords in one list plus each disease's (start, end) slice into
+    # it, so fuzzy scores for every disease come out of a single cdist call.
+    all_keywords = []
+    spans = {}
+    for disease_name, keywords in _read_disease_keywords(keyword_folder).items():
+        spans[disease_name] = (len(all_keywords), len(all_keywords) + len(keywords))
+        all_keywords.extend(keywords)
+    return all_keywords, spans
+
+
+def _find_exact_keywords(transcript_text, keyword_folder):
+    # Set of disease keywords present in the (lowercased) transcript: single-word
+    # keywords by set intersection with its words, phrases by substring search.
+    tokens, phrases = _partition_keywords(keyword_folder)
+    transcript_text = transcript_text.lower()
+    found = set(tokens.intersection(_split_words(transcript_text)))
+
+    automaton = _build_keyword_automaton(keyword_folder)
+    if automaton is not None:
+        found.update(kw for _, kw in automaton.iter(transcript_text))
+    else:
+        # Without pyahocorasick: keywords are literal text, so str.__contains__ gives
+        # the same answer as an escaped regex search without compiling anything.
+        found.update(kw for kw in phrases if kw in transcript_text)
+    return found
+
+
+def _find_exact_keywords_streaming(chunks, keyword_folder, parts):
+    # Same result as _find_exact_keywords("".join(parts)), but computed chunk by
+    # chunk as the transcript arrives; every chunk is appended to parts. The last,
+    # possibly unfinished word and the last (longest phrase - 1) characters are
+    # carried over so hits spanning two chunks are not lost.
+    if _load_disease_keywords(keyword_folder) is None:
+        parts.extend(chunks) # match_disease reports the missing folder
+        return set()
+
+    tokens, phrases = _partition_keywords(keyword_folder)
+    automaton = _build_keyword_automaton(keyword_folder)
+    overlap = max(map(len, phrases), default=1) - 1
+    found = set()
+    pending = "" # text of the unfinished last word
+    tail = "" # end of the previous chunk, for phrases that straddle chunks
+
+    for chunk in chunks:
+        parts.append(chunk)
+        chunk = chunk.lower()
+
+        text = pending + chunk
+        cut = re.search(r"\S*$", text).start()
+        found.update(tokens.intersection(_split_words(text[:cut])))
+        pending = text[cut:]
+
+        window = tail + chunk
+        if automaton is not None:
+            found.update(kw for _, kw in automaton.iter(window))
         else:
-            for dk in disease_keywords_long: # 'dk' is a keyword from the disease .txt file
-                best = 0
-                for ek in extracted: # 'ek' is a word from the transcript
-                    # Use partial_ratio to find 'stuck' in 'stuck on appearance'
-                    s = fuzz.partial_ratio(ek, dk)
-                    if s > best:
-                        best = s
-                sum_best += best # Add the best possible match for this disease keyword
-            
-            # Average the score over the number of disease keywords
-            avg_fuzzy = sum_best / len(disease_keywords_long)
-
-        # --- exact coverage ---
-        # Checks if any of the specific diagnostic phrases are present in the full transcript.
-        exact_matches = 0
-        for dk in disease_keywords_long:
-            # Use re.search to find the keyword *anywhere* in the text
-            if re.search(re.escape(dk), transcript_text):
-                exact_matches += 1
-                
-        exact_coverage = (exact_matches / max(1, len(disease_keywords_long))) * 100.0
-
-        # --- combine ---
-        # We give fuzzy matching more weight because users rarely say the exact medical term
-        final_score = 0.65 * avg_fuzzy + 0.35 * exact_coverage
-        results.append((disease_name, round(final_score, 1), round(avg_fuzzy, 1), round(exact_coverage, 1)))
+            found.update(kw for kw in phrases if kw in window)
+        tail = window[-overlap:] if overlap else ""
+
+    found.update(tokens.intersection(_split_words(pending)))
+    return found
+
+
+def reload_keywords(keyword_folder=KEYWORD_FOLDER):
+    """Drops the cached keyword corpus so edited .txt files are picked up. For manual/REPL use; nothing here calls it."""
+    _read_disease_keywords.cache_clear()
+    _partition_keywords.cache_clear()
+    _build_keyword_automaton.cache_clear()
+    _flatten_disease_keywords.cache_clear()
+    return _load_disease_keywords(keyword_folder)
+
+
+# Read the default corpus and build its automaton once, at import
+if _load_disease_keywords(KEYWORD_FOLDER) is not None:
+    _build_keyword_automaton(KEYWORD_FOLDER)
+
+
+# ---- STEP 3: Match Extracted Keywords with Diseases (NEW LOGIC) ----
+def _score_disease(disease_name, disease_keywords_long, best_scores, exact_keywords):
+    # Scores one disease from the best fuzzy score of each of its keywords
+    # (a slice of the shared cdist result) and the exact hits in the transcript.
+
+    # --- fuzzy match average (NEW LOGIC) ---
+    # Answers: "How well does the transcript cover this disease's keywords?"
+    if not disease_keywords_long:
+        avg_fuzzy = 0.0 # No keywords to match
+    else:
+        # Average the best score over the number of disease keywords
+        avg_fuzzy = float(best_scores.mean())
+
+    # --- exact coverage ---
+    # Checks if any of the specific diagnostic phrases are present in the full transcript.
+    exact_matches = sum(1 for dk in disease_keywords_long if dk in exact_keywords)
+    exact_coverage = (exact_matches / max(1, len(disease_keywords_long))) * 100.0
+
+    # --- combine ---
+    # We give fuzzy matching more weight because users rarely say the exact medical term
+    final_score = 0.65 * avg_fuzzy + 0.35 * exact_coverage
+    return (disease_name, round(final_score, 1), round(avg_fuzzy, 1), round(exact_coverage, 1))
+
+
+def match_disease(extracted_keywords, transcript_text, keyword_folder=KEYWORD_FOLDER, exact_keywords=None):
+    # exact_keywords may be passed in when the exact hits were already collected
+    # while transcribing (see transcribe_and_match).
+    # This stop_tokens list is a bit redundant now but harmless
+    stop_tokens = {"a", "an", "the", "is", "it", "i", "me", "my", "we", "you", "he", "she", "they", "small", "large"}
+    extracted = [k for k in extracted_keywords if len(k) >= 3 and k not in stop_tokens]
+    if not extracted:
+        return ("NoKeywords", 0), []
+
+    results = []
+    
+    # Check if keyword folder exists
+    disease_keywords = _load_disease_keywords(keyword_folder)
+    if disease_keywords is None:
+        print(f"Error: Keyword folder '{keyword_folder}' not found.")
+        print("Please make sure the 'keywords' folder is in the same directory as the script.")
+        return ("KeywordFolderNotFound", 0), []
+
+    if exact_keywords is None:
+        exact_keywords = _find_exact_keywords(transcript_text, keyword_folder)
+
+    # --- fuzzy scores for every (transcript word, disease keyword) pair ---
+    # Use partial_ratio to find 'stuck' in 'stuck on appearance'. cdist runs the
+    # whole matrix in C++ across all cores (workers=-1), so every disease is
+    # scored in parallel without a process pool; taking the max over transcript
+    # words leaves the best match for each disease keyword.
+    all_keywords, spans = _flatten_disease_keywords(keyword_folder)
+    if all_keywords:
+        scores = _fuzzy_score_matrix(extracted, all_keywords)
+        best_per_keyword = scores.max(axis=0)
+    else:
+        best_per_keyword = np.zeros(0)
+
+    for disease_name, disease_keywords_long in disease_keywords.items():
+        start, end = spans[disease_name]
+        results.append(_score_disease(disease_name, disease_keywords_long, best_per_keyword[start:end], exact_keywords))
 
     if not results:
         print("No .txt files found in the 'keywords' folder.")
@@ -158,6 +459,32 @@ def match_disease(extracted_keywords, transcript_text, keyword_folder="keywords"
     return best, sorted_results
 
 
+def transcribe_and_match(file_path, model_name, keyword_folder=KEYWORD_FOLDER):
+    # Runs steps 1-3 with the exact keyword pass overlapped with decoding: hits are
+    # collected segment by segment, so once the last segment arrives only the
+    # fuzzy reduction is left. Returns (transcript_text, keywords, best_match,
+    # all_scores), or None if no transcript was produced.
+    segments = _transcribe_segments(file_path, model_name)
+    if segments is None:
+        return None
+
+    parts = []
+    try:
+        exact_keywords = _find_exact_keywords_streaming((seg.text for seg in segments), keyword_folder, parts)
+        print("Transcription complete.")
+    except Exception as e:
+        print(f"Error during transcription: {e}")
+        return None
+
+    transcript_text = "".join(parts)
+    if not transcript_text:
+        return None
+
+    keywords = get_transcript_words(transcript_text)
+    best_match, all_scores = match_disease(keywords, transcript_text, keyword_folder=keyword_folder, exact_keywords=exact_keywords)
+    return transcript_text, keywords, best_match, all_scores
+
+
 # ---- STEP 4: Save Transcript and Keywords ----
 def save_transcript_and_keywords(text, keywords, output_file):
     try:
@@ -183,16 +510,13 @@ def main():
     base_name = os.path.splitext(os.path.basename(args.video_path))[0]
     transcript_path = args.output_file if args.output_file else f"{base_name}.txt"
 
-    transcript_text = get_transcript(args.video_path, args.model)
+    result = transcribe_and_match(args.video_path, args.model, keyword_folder=KEYWORD_FOLDER)
 
-    if transcript_text:
-        # ---- THIS IS THE UPDATED LINE ----
-        keywords = get_transcript_words(transcript_text)
+    if result:
+        transcript_text, keywords, best_match, all_scores = result
         
         print(f"\n--- Found {len(keywords)} Unique Transcript Words (for matching) ---")
-        print(keywords)
-
-        best_match, all_scores = match_disease(keywords, transcript_text, keyword_folder="keywords")
+        print(sorted(keywords))
 
         print(f"\n--- Most Likely Disease ---")
         print(f"{best_match[0]} (Match Score: {best_match[1]}%)")
@@ -202,7 +526,7 @@ def main():
             # Corrected the typo here
             print(f"{disease}: {final_score}%  (fuzzy={avg_fuzzy}, exact={exact_cov})")
 
-        save_transcript_and_keywords(transcript_text, keywords, transcript_path)
+        save_transcript_and_keywords(transcript_text, sorted(keywords), transcript_path)
     else:
         print("No transcript generated.")
 
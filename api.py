@@ -1,6 +1,9 @@
-from flask import Flask, jsonify, request, g
+from flask import Flask, request
+import orjson
 import sqlite3
 import os
+import threading
+from contextlib import closing
 from datetime import datetime, timedelta
 from flask_cors import CORS # Used to allow your HTML/JS file to access this API
 
@@ -8,84 +11,115 @@ app = Flask(__name__)
 CORS(app) # Enable CORS for cross-origin requests from your HTML file
 DATABASE = 'medicas.db' # Or 'database.sqlite' if you rename the file
 
+def ojsonify(payload):
+    """Drop-in for jsonify that serializes with orjson (much faster than stdlib json)."""
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
+
 # --- Database Connection Management ---
 
+_local = threading.local() # Holds one reusable connection per worker thread
+
+def _connect():
+    """Opens a new connection with WAL journaling and relaxed fsync settings."""
+    db = sqlite3.connect(DATABASE, check_same_thread=False)
+    db.row_factory = sqlite3.Row # Allows accessing columns by name
+    db.execute("PRAGMA journal_mode=WAL") # Readers no longer block the writer
+    db.execute("PRAGMA synchronous=NORMAL") # fsync at checkpoints instead of every commit
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA mmap_size=268435456")
+    return db
+
 def get_db():
-    """Connects to the specified database."""
-    db = getattr(g, '_database', None)
+    """Returns this thread's database connection, opening it on first use."""
+    db = getattr(_local, 'database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row # Allows accessing columns by name
+        db = _local.database = _connect()
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """Closes the database connection when the application context ends."""
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    """Rolls back anything left uncommitted; the connection stays open for the next request."""
+    db = getattr(_local, 'database', None)
+    if db is not None and db.in_transaction:
+        db.rollback()
 
 # --- Utility Function to run initial database setup (from your provided code) ---
 
 def init_db():
     """Initializes the database with tables and doctors if they don't exist."""
-    with app.app_context():
-        db = get_db()
+    # Uses its own short-lived connection so no pooled connection outlives setup
+    with closing(_connect()) as db:
         cursor = db.cursor()
 
-        # 1. Create the Doctors Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS doctors (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                specialty TEXT NOT NULL
-            )
-        ''')
-
-        # 2. Create the Appointments Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS appointments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                doctor_id TEXT,
-                date TEXT NOT NULL,
-                time TEXT NOT NULL,
-                is_booked INTEGER DEFAULT 0,
-                patient_id TEXT,
-                FOREIGN KEY (doctor_id) REFERENCES doctors(id)
-            )
-        ''')
-
-        # 3. Insert Initial Doctors Data
-        doctors_data = [
-            ('DR_PIYUSH_GUPTA', 'Dr. Piyush Gupta', 'Dermatology'),
-            ('DR_K_PATEL_GP', 'Dr. K. Patel', 'General Physician'),
-            ('DR_M_MOHAN', 'Dr. M. Mohan', 'Pediatrics'),
-            ('DR_RK_SHARMA', 'Dr. RK. Sharma', 'Obstetrics Gynecology')
-        ]
-        # Insert or ignore doctors, in case the script runs multiple times
-        cursor.executemany("INSERT OR IGNORE INTO doctors VALUES (?, ?, ?)", doctors_data)
+        # Run all DDL and inserts as one transaction (committed when the block exits).
+        # sqlite3 only opens a transaction implicitly before DML, so BEGIN is explicit
+        # here; otherwise each CREATE/ALTER statement would autocommit on its own.
+        with db:
+            cursor.execute("BEGIN")
+            # 1. Create the Doctors Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS doctors (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    specialty TEXT NOT NULL
+                )
+            ''')
+
+            # 2. Create the Appointments Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS appointments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    doctor_id TEXT,
+                    date TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    is_booked INTEGER DEFAULT 0,
+                    patient_id TEXT,
+                    day TEXT,
+                    FOREIGN KEY (doctor_id) REFERENCES doctors(id)
+                )
+            ''')
+            # Databases created before the day column existed: add it and fill it in
+            columns = [col[1] for col in cursor.execute("PRAGMA table_info(appointments)")]
+            if 'day' not in columns:
+                cursor.execute("ALTER TABLE appointments ADD COLUMN day TEXT")
+            missing_dates = [row[0] for row in cursor.execute("SELECT DISTINCT date FROM appointments WHERE day IS NULL").fetchall()]
+            cursor.executemany("UPDATE appointments SET day = ? WHERE date = ? AND day IS NULL",
+                               [(datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'), date_str) for date_str in missing_dates])
+            # One row per doctor/date/time, so re-seeding can rely on INSERT OR IGNORE
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_appt_slot ON appointments(doctor_id, date, time)")
+            # Lookup indexes for /api/slots: doctor by specialty, then open slots by date
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_doc_specialty ON doctors(specialty)")
+            # (time is included so ORDER BY date, time is served by the index with no sort step)
+            cursor.execute("DROP INDEX IF EXISTS idx_appt_lookup")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_appt_open_slots ON appointments(doctor_id, is_booked, date, time)")
+
+            # 3. Insert Initial Doctors Data
+            doctors_data = [
+                ('DR_PIYUSH_GUPTA', 'Dr. Piyush Gupta', 'Dermatology'),
+                ('DR_K_PATEL_GP', 'Dr. K. Patel', 'General Physician'),
+                ('DR_M_MOHAN', 'Dr. M. Mohan', 'Pediatrics'),
+                ('DR_RK_SHARMA', 'Dr. RK. Sharma', 'Obstetrics Gynecology')
+            ]
+            # Insert or ignore doctors, in case the script runs multiple times
+            cursor.executemany("INSERT OR IGNORE INTO doctors VALUES (?, ?, ?)", doctors_data)
         
-        # 4. Insert Initial Appointment Slots (Mock Data Generation)
-        # This simulates fixed availability for the next few days.
-        today = datetime.now().date()
-        slots_to_insert = []
-        for i in range(1, 4):  # Next 3 days
-            date_str = (today + timedelta(days=i)).strftime('%Y-%m-%d')
-            for doc_id in [d[0] for d in doctors_data]:
-                # Generate two slots per doctor per day
-                slots_to_insert.append((doc_id, date_str, "09:00 AM", 0, None))
-                slots_to_insert.append((doc_id, date_str, "04:00 PM", 0, None))
+            # 4. Insert Initial Appointment Slots (Mock Data Generation)
+            # This simulates fixed availability for the next few days.
+            today = datetime.now().date()
+            slots_to_insert = []
+            for i in range(1, 4):  # Next 3 days
+                slot_date = today + timedelta(days=i)
+                date_str = slot_date.strftime('%Y-%m-%d')
+                day_str = slot_date.strftime('%A') # Stored so /api/slots never has to parse dates
+                for doc_id in [d[0] for d in doctors_data]:
+                    # Generate two slots per doctor per day
+                    slots_to_insert.append((doc_id, date_str, "09:00 AM", 0, None, day_str))
+                    slots_to_insert.append((doc_id, date_str, "04:00 PM", 0, None, day_str))
         
-        # Insert initial available slots
-        insert_slot_sql = "INSERT INTO appointments (doctor_id, date, time, is_booked, patient_id) VALUES (?, ?, ?, ?, ?)"
-        
-        # Check if slots exist before inserting (avoids duplicates without relying on complex logic)
-        for doc_id, date_str, time_str, is_booked, patient_id in slots_to_insert:
-            cursor.execute("SELECT COUNT(*) FROM appointments WHERE doctor_id = ? AND date = ? AND time = ?", (doc_id, date_str, time_str))
-            if cursor.fetchone()[0] == 0:
-                 cursor.execute(insert_slot_sql, (doc_id, date_str, time_str, is_booked, patient_id))
+            # Insert initial available slots; slots that already exist are skipped via idx_appt_slot
+            insert_slot_sql = "INSERT OR IGNORE INTO appointments (doctor_id, date, time, is_booked, patient_id, day) VALUES (?, ?, ?, ?, ?, ?)"
+            cursor.executemany(insert_slot_sql, slots_to_insert)
 
-        db.commit()
         print("Database structure and initial data checked/created.")
 
 
@@ -100,7 +134,7 @@ def get_slots():
     # 1. Get the Doctor ID based on specialty
     doc_row = db.execute("SELECT id, name FROM doctors WHERE specialty = ?", (specialty,)).fetchone()
     if not doc_row:
-        return jsonify({"slots": []})
+        return ojsonify({"slots": []})
 
     doctor_id = doc_row['id']
     
@@ -109,7 +143,7 @@ def get_slots():
     today_str = datetime.now().date().strftime('%Y-%m-%d')
     
     slots_query = """
-        SELECT id, date, time 
+        SELECT id, date, time, day 
         FROM appointments 
         WHERE doctor_id = ? AND is_booked = 0 AND date >= ? 
         ORDER BY date, time 
@@ -123,13 +157,13 @@ def get_slots():
             "id": row['id'],
             "date": row['date'],
             "time": row['time'],
-            "day": datetime.strptime(row['date'], '%Y-%m-%d').strftime('%A'), # Add day of the week
+            "day": row['day'], # Day of the week, stored at insert time
             "is_best_match": len(slots_list) == 0, # Simple mock logic: first slot is "best"
             "doctorId": doctor_id,
             "doctorName": doc_row['name']
         })
 
-    return jsonify({"slots": slots_list})
+    return ojsonify({"slots": slots_list})
 
 
 @app.route('/api/book', methods=['POST'])
@@ -140,7 +174,7 @@ def book_appointment():
     patient_id = data.get('patient_id', 'WEB_USER') # Use a default or the actual user ID
 
     if not slot_id:
-        return jsonify({"message": "Slot ID required"}), 400
+        return ojsonify({"message": "Slot ID required"}), 400
 
     db = get_db()
     cursor = db.cursor()
@@ -154,18 +188,21 @@ def book_appointment():
         db.commit()
 
         if cursor.rowcount == 0:
-            return jsonify({"message": "Slot is already booked or does not exist."}), 409
+            return ojsonify({"message": "Slot is already booked or does not exist."}), 409
         
-        return jsonify({"message": "Appointment successfully booked", "appointment_id": slot_id}), 200
+        return ojsonify({"message": "Appointment successfully booked", "appointment_id": slot_id}), 200
 
     except Exception as e:
         db.rollback()
-        return jsonify({"message": f"Database error: {e}"}), 500
+        return ojsonify({"message": f"Database error: {e}"}), 500
+
+
+# Initialize DB (creates medicas.db and tables if missing, and adds the day column to
+# older databases). Runs at import so the schema is current before the first request;
+# with preload_app, Gunicorn does this once in the master before forking workers.
+init_db()
 
 
 if __name__ == '__main__':
-    # Initialize DB (creates medicas.db and tables if missing)
-    init_db()
-    # Run the Flask app
-    # In a production environment, you would use a dedicated web server like Gunicorn
+    # Run the Flask development server; production uses Gunicorn (see gunicorn.conf.py)
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
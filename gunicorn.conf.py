@@ -0,0 +1,12 @@
+import os
+
+# Import api once in the master (running init_db there) and fork workers from it,
+# instead of every worker importing and initializing on its own.
+preload_app = True
+
+workers = os.cpu_count() or 1
+
+# Threaded workers: each thread keeps its own pooled SQLite connection (see
+# api.get_db), and sqlite3 releases the GIL while queries run.
+worker_class = "gthread"
+threads = 4
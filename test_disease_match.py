@@ -0,0 +1,32 @@
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("faster_whisper")
+rapidfuzz = pytest.importorskip("rapidfuzz")
+
+import Disease_match as dm
+
+
+# The fallback kernel switches from the bit-parallel LCS to the DP row at 63
+# characters; warnings are errors so int64 wrap-around in the non-jitted path fails.
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("needle_len", [62, 63, 64])
+def test_partial_ratio_matrix_matches_rapidfuzz_at_word_boundary(needle_len):
+    rng = random.Random(needle_len)
+
+    def rand_text(length):
+        return "".join(rng.choice("abcd ") for _ in range(length))
+
+    extracted = [rand_text(needle_len) for _ in range(4)]
+    keywords = [rand_text(needle_len + extra) for extra in (0, 1, 7, 30)]
+
+    symbols = {}
+    ext_chars, ext_lens = dm._encode_strings(extracted, symbols)
+    dk_chars, dk_lens = dm._encode_strings(keywords, symbols)
+    scores = dm._partial_ratio_matrix(ext_chars, ext_lens, dk_chars, dk_lens, len(symbols))
+
+    expected = rapidfuzz.process.cdist(extracted, keywords, scorer=rapidfuzz.fuzz.partial_ratio, dtype=np.float64)
+    np.testing.assert_allclose(scores, expected)